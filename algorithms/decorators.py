@@ -1,23 +1,131 @@
 import functools
+import random
+import time
+
+
+# --- Tracing policies ---
+# A policy decides, per call, whether it is recorded. Under any policy other than
+# RecordAll, each recorded call gets `hidden_calls`/`hidden_time`: the number and
+# total time of the unrecorded calls it is the nearest recorded ancestor of.
+
+class RecordAll:
+    """Records every call."""
+    records_all = True  # Nothing is hidden, so no summaries are needed
+    needs_ancestry = False
+
+    def reset(self):
+        pass
+
+    def admit(self, trace, call_id, depth, index, parent_recorded):
+        return True
+
+
+class DepthCap:
+    """Records only the first `max_depth` levels of the recursion."""
+    records_all = False
+    needs_ancestry = False
+
+    def __init__(self, max_depth):
+        self.max_depth = max_depth
+
+    def reset(self):
+        pass
+
+    def admit(self, trace, call_id, depth, index, parent_recorded):
+        return depth < self.max_depth
+
+
+class EveryKthSubtree:
+    """
+    Records the root and every k-th child subtree (0th, kth, 2kth...) of each recorded call.
+
+    Only thins out branching recursions: in a linear recursion (e.g. factorial) every
+    call is its parent's 0th child, so every call is recorded.
+    """
+    records_all = False
+    needs_ancestry = False
+
+    def __init__(self, k):
+        self.k = k
+
+    def reset(self):
+        pass
+
+    def admit(self, trace, call_id, depth, index, parent_recorded):
+        return parent_recorded and index % self.k == 0
+
+
+class ReservoirSample:
+    """Records the root plus a uniform random sample of `size` of its descendants (reservoir sampling)."""
+    records_all = False
+    needs_ancestry = True  # Sampled calls are re-attached to their nearest sampled ancestor
+
+    def __init__(self, size, seed=None):
+        self.size = size
+        self.seed = seed
+        self.reset()
+
+    def reset(self):
+        self.rng = random.Random(self.seed)
+        self.seen = 0
+        self.sample = []
+
+    def admit(self, trace, call_id, depth, index, parent_recorded):
+        if depth == 0:
+            # Always keep the root so the tree stays connected; each top-level call gets its own sample
+            self.seen = 0
+            self.sample = []
+            return True
+        self.seen += 1
+        if len(self.sample) < self.size:
+            self.sample.append(call_id)
+            return True
+        slot = self.rng.randrange(self.seen)
+        if slot < self.size:
+            trace.discard(self.sample[slot])
+            self.sample[slot] = call_id
+            return True
+        return False
+
 
 class RecursionTrace:
-    def __init__(self):
+    def __init__(self, policy=None):
+        self.reset(policy)
+
+    def reset(self, policy=None):
+        self.policy = policy or RecordAll()
+        self.policy.reset()
         self.calls = {}  # Map call_id -> call_info
         self.events = [] # List of events (start/end)
-        self.call_stack = []
-        self.next_id = 0
-
-    def reset(self):
-        self.calls = {}
-        self.events = []
-        self.call_stack = []
+        self.call_stack = []  # Recorded call ids only
         self.next_id = 0
+        # One frame per live call, recorded or not:
+        # [call_id, recorded, start_time, subtree_calls, child_time, children_started]
+        self._frames = []
+        self._pending = []  # Recorded ids awaiting finalization
+        self._finalized_events = 0
 
     def start_call(self, func_name, args, kwargs):
         call_id = self.next_id
         self.next_id += 1
+
+        # Fast path: RecordAll keeps no frames, timings or hidden-call summaries
+        if not self.policy.records_all:
+            depth = len(self._frames)
+            parent = self._frames[-1] if self._frames else None
+            index = 0
+            if parent is not None:
+                index = parent[5]
+                parent[5] += 1
+            parent_recorded = parent is None or parent[1]
+
+            recorded = self.policy.admit(self, call_id, depth, index, parent_recorded)
+            self._frames.append([call_id, recorded, time.perf_counter(), 1, 0.0, 0])
+            if not recorded:
+                return call_id
+
         parent_id = self.call_stack[-1] if self.call_stack else None
-        
+
         call_info = {
             "id": call_id,
             "parent_id": parent_id,
@@ -27,9 +135,13 @@ class RecursionTrace:
             "return_value": None,
             "status": "running"
         }
+        if self.policy.needs_ancestry:
+            call_info["ancestors"] = [frame[0] for frame in self._frames[:-1]]
         self.calls[call_id] = call_info
         self.call_stack.append(call_id)
-        
+        if not self.policy.records_all:
+            self._pending.append(call_id)
+
         self.events.append({
             "type": "start",
             "call_id": call_id
@@ -37,20 +149,78 @@ class RecursionTrace:
         return call_id
 
     def end_call(self, return_value):
-        if not self.call_stack:
+        if self.policy.records_all:
+            if self.call_stack:
+                self._complete(self.call_stack.pop(), return_value)
             return
-        
-        call_id = self.call_stack.pop()
+
+        if not self._frames:
+            return
+
+        call_id, recorded, start_time, subtree_calls, child_time, _ = self._frames.pop()
+        duration = time.perf_counter() - start_time
+        if self._frames:
+            parent = self._frames[-1]
+            parent[3] += subtree_calls
+            parent[4] += duration
+
+        if recorded:
+            self.call_stack.pop()
+            if call_id in self.calls:
+                call_info = self.calls[call_id]
+                call_info["duration"] = duration
+                call_info["subtree_calls"] = subtree_calls
+                call_info["child_time"] = child_time
+                self._complete(call_id, return_value)
+
+        if not self._frames:
+            self._finalize()
+
+    def _complete(self, call_id, return_value):
         if call_id in self.calls:
             self.calls[call_id]["return_value"] = return_value
             self.calls[call_id]["status"] = "completed"
-            
+
             self.events.append({
                 "type": "end",
                 "call_id": call_id,
                 "return_value": return_value
             })
 
+    def discard(self, call_id):
+        """Drops a recorded call (used by sampling policies). Its events are pruned on finalize."""
+        self.calls.pop(call_id, None)
+
+    def _finalize(self):
+        """Repairs parent links and computes hidden-call summaries once a top-level call returns."""
+        pending = [cid for cid in self._pending if cid in self.calls]
+        self._pending = []
+
+        if self.policy.needs_ancestry:
+            for cid in pending:
+                call = self.calls[cid]
+                ancestors = call.pop("ancestors")
+                if call["parent_id"] is not None and call["parent_id"] not in self.calls:
+                    call["parent_id"] = next((a for a in reversed(ancestors) if a in self.calls), None)
+            self.events[self._finalized_events:] = [
+                e for e in self.events[self._finalized_events:] if e["call_id"] in self.calls
+            ]
+        self._finalized_events = len(self.events)
+
+        # Whatever a call's subtree did outside its recorded children is hidden work
+        covered_calls = {}
+        covered_time = {}
+        for cid in pending:
+            call = self.calls[cid]
+            pid = call["parent_id"]
+            if pid is not None:
+                covered_calls[pid] = covered_calls.get(pid, 0) + call["subtree_calls"]
+                covered_time[pid] = covered_time.get(pid, 0.0) + call["duration"]
+        for cid in pending:
+            call = self.calls[cid]
+            call["hidden_calls"] = call["subtree_calls"] - 1 - covered_calls.get(cid, 0)
+            call["hidden_time"] = call["child_time"] - covered_time.get(cid, 0.0) if call["hidden_calls"] else 0.0
+
 # Global tracer instance
 tracer = RecursionTrace()
 
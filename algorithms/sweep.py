@@ -0,0 +1,140 @@
+"""Multi-input sweeps: trace an algorithm over a range of n and fit its growth"""
+import math
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .decorators import tracer
+from .fibonacci import fibonacci
+from .factorial import factorial
+from .hanoi import tower_of_hanoi
+
+# Algorithm name -> (function, n -> call arguments)
+SWEEP_TARGETS = {
+    "Fibonacci": (fibonacci, lambda n: (n,)),
+    "Factorial": (factorial, lambda n: (n,)),
+    "Tower of Hanoi": (tower_of_hanoi, lambda n: (n, "A", "C", "B")),
+}
+
+GROWTH_MODELS = {
+    "constant": lambda n: 1,
+    "logarithmic": lambda n: math.log2(n) if n > 1 else 0,
+    "linear": lambda n: n,
+    "linearithmic": lambda n: n * math.log2(n) if n > 1 else 0,
+    "quadratic": lambda n: n ** 2,
+    "exponential": lambda n: 2 ** n,
+}
+
+METRICS = ("calls", "max_depth", "events", "wall_time")
+
+
+def measure(algo_name, n):
+    """
+    Traces one run and reduces it to compact aggregates.
+
+    Runs inside pool workers, so only this small dict crosses the process boundary.
+    """
+    func, make_args = SWEEP_TARGETS[algo_name]
+    tracer.reset()
+    start = time.perf_counter()
+    func(*make_args(n))
+    wall_time = time.perf_counter() - start
+
+    depth = max_depth = 0
+    for event in tracer.events:
+        if event["type"] == "start":
+            depth += 1
+            max_depth = max(max_depth, depth)
+        else:
+            depth -= 1
+
+    result = {
+        "n": n,
+        "calls": len(tracer.calls),
+        "max_depth": max_depth,
+        "events": len(tracer.events),
+        "wall_time": wall_time,
+    }
+    tracer.reset()  # Free the trace before the worker picks up the next n
+    return result
+
+
+def sweep(algo_name, ns, max_workers=None):
+    """
+    Measures `algo_name` for every n in `ns` across a process pool.
+
+    Args:
+        algo_name (str): Key of SWEEP_TARGETS
+        ns (iterable): Input sizes
+        max_workers (int): Pool size (defaults to the CPU count)
+
+    Returns:
+        list: One `measure` dict per n, sorted by n
+    """
+    # Largest inputs first so the slowest jobs don't start last
+    ns = sorted(set(ns), reverse=True)
+    # Spawn, not fork: the Streamlit server is multi-threaded, and forking it can deadlock
+    mp_context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context) as pool:
+        results = list(pool.map(measure, [algo_name] * len(ns), ns))
+    return sorted(results, key=lambda r: r["n"])
+
+
+def _r_squared(ys, fitted):
+    mean = sum(ys) / len(ys)
+    ss_tot = sum((y - mean) ** 2 for y in ys)
+    ss_res = sum((y - f) ** 2 for y, f in zip(ys, fitted))
+    return 1 - ss_res / ss_tot if ss_tot else 1.0
+
+
+def _linear_regression(xs, ys):
+    """Least-squares y = a + b*x. Returns (a, b, r_squared)."""
+    count = len(xs)
+    mean_x = sum(xs) / count
+    mean_y = sum(ys) / count
+    var_x = sum((x - mean_x) ** 2 for x in xs)
+    b = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var_x if var_x else 0.0
+    a = mean_y - b * mean_x
+    return a, b, _r_squared(ys, [a + b * x for x in xs])
+
+
+def fit_growth(ns, values, model):
+    """
+    Fits values ≈ c * f(n) + d for a growth model f from GROWTH_MODELS.
+
+    Returns:
+        dict: {"model", "scale", "offset", "r_squared", "fitted"}
+    """
+    f = GROWTH_MODELS[model]
+    fs = [f(n) for n in ns]
+    offset, scale, r_squared = _linear_regression(fs, values)
+    return {
+        "model": model,
+        "scale": scale,
+        "offset": offset,
+        "r_squared": r_squared,
+        "fitted": [offset + scale * x for x in fs],
+    }
+
+
+def empirical_growth(ns, values):
+    """
+    Estimates the observed growth rate in log space.
+
+    Returns:
+        dict: {"base", "base_r_squared", "exponent", "exponent_r_squared"} where
+        values ~ base**n (exponential fit) and values ~ n**exponent (power-law fit).
+        Points with non-positive n or value are ignored.
+    """
+    points = [(n, v) for n, v in zip(ns, values) if n > 0 and v > 0]
+    if len(points) < 2:
+        return None
+    log_vs = [math.log(v) for _, v in points]
+    _, slope_exp, r2_exp = _linear_regression([n for n, _ in points], log_vs)
+    _, slope_pow, r2_pow = _linear_regression([math.log(n) for n, _ in points], log_vs)
+    return {
+        "base": math.exp(slope_exp),
+        "base_r_squared": r2_exp,
+        "exponent": slope_pow,
+        "exponent_r_squared": r2_pow,
+    }
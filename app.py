@@ -2,31 +2,44 @@ import streamlit as st
 import inspect
 import time
 import streamlit.components.v1 as components
+import altair as alt
 from algorithms import fibonacci, factorial, tower_of_hanoi, tracer
-from visualizers import generate_dot
-from visualizers.hanoi_viz import get_hanoi_state_at_step
+from algorithms.decorators import DepthCap, EveryKthSubtree, ReservoirSample
+from algorithms.sweep import METRICS, sweep, fit_growth, empirical_growth
+from visualizers import generate_dot, generate_svg
+from visualizers.hanoi_viz import get_hanoi_state_at_step, hanoi_stylesheet
+from visualizers.timeline import TimelineIndex
+from instrumentation import Metrics
 
 st.set_page_config(page_title="Recursion Visualizer", layout="wide", page_icon="🔄", initial_sidebar_state="expanded")
 
+HANOI_MAX_DISKS = 5
+
 # --- Educational Content ---
 ALGO_INFO = {
     "Fibonacci": {
         "description": "Calculates the nth number in the Fibonacci sequence, where each number is the sum of the two preceding ones.",
         "complexity": "<b>Time:</b> O(2ⁿ) (Exponential) | <b>Space:</b> O(n) (Stack depth)",
         "insight": "Notice how the same values (e.g., fib(2)) are recalculated multiple times. This overlapping subproblems property is why dynamic programming is often preferred.",
-        "func": fibonacci
+        "func": fibonacci,
+        "growth": "exponential",
+        "sweep_range": (1, 25)
     },
     "Factorial": {
         "description": "Calculates the product of all positive integers less than or equal to n.",
         "complexity": "<b>Time:</b> O(n) (Linear) | <b>Space:</b> O(n) (Stack depth)",
         "insight": "This is a linear recursion. The stack grows linearly with n until the base case (n=0) is reached, then unwinds.",
-        "func": factorial
+        "func": factorial,
+        "growth": "linear",
+        "sweep_range": (0, 300)
     },
     "Tower of Hanoi": {
         "description": "Moves n disks from a source rod to a target rod using an auxiliary rod, following specific rules.",
         "complexity": "<b>Time:</b> O(2ⁿ) (Exponential) | <b>Space:</b> O(n) (Stack depth)",
         "insight": "The problem is solved by moving n-1 disks to the auxiliary rod, moving the largest disk to the target, and then moving the n-1 disks from auxiliary to target.",
-        "func": tower_of_hanoi
+        "func": tower_of_hanoi,
+        "growth": "exponential",
+        "sweep_range": (1, 18)
     }
 }
 
@@ -55,6 +68,23 @@ st.markdown("""
         max-width: 100%;
         max-height: 100%;
     }
+    .native-tree {
+        width: 100%;
+        height: 500px;
+        overflow: auto;
+        background-color: #ffffff;
+        border: 1px solid #e0e0e0;
+        border-radius: 8px;
+        padding: 10px;
+        box-shadow: 0 2px 4px rgba(0,0,0,0.05);
+        display: flex;
+        align-items: center;
+        justify-content: center;
+    }
+    .native-tree > svg {
+        max-width: 100%;
+        max-height: 100%;
+    }
 
     /* Info Boxes */
     .info-box {
@@ -156,27 +186,77 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Tower of Hanoi rules for every disk count, so each frame only sends class-based markup
+st.markdown(hanoi_stylesheet(HANOI_MAX_DISKS), unsafe_allow_html=True)
+
 st.title("🔄 Recursion Visualizer")
 
+# Per-session hot-path metrics
+if "metrics" not in st.session_state:
+    st.session_state.metrics = Metrics()
+metrics = st.session_state.metrics
+metrics.incr("reruns")
+
 # --- Sidebar ---
 st.sidebar.header("⚙️ Configuration")
 algo_name = st.sidebar.selectbox("Select Algorithm", list(ALGO_INFO.keys()))
 
-# Input Parameters
+# Tracing policy (Hanoi's disk view needs every call, so it is always fully traced).
+# Every mode offered must bound the recorded tree, since it unlocks larger inputs:
+# every k-th subtree only thins out branching recursions, so Factorial doesn't get it.
+policy = None
+if algo_name != "Tower of Hanoi":
+    trace_modes = ["Full", "Depth cap", "Reservoir sample"]
+    if algo_name == "Fibonacci":
+        trace_modes.insert(2, "Every k-th subtree")
+    trace_mode = st.sidebar.selectbox(
+        "Tracing Mode", trace_modes,
+        help="Sampling modes record part of the tree and summarize the skipped calls on the nearest recorded ancestor. "
+             "Every k-th subtree only thins out calls with several children."
+    )
+    if trace_mode == "Depth cap":
+        # 2^8 - 1 = 255 nodes at most for Fibonacci, which both renderers still draw quickly
+        policy = DepthCap(st.sidebar.number_input("Max depth", min_value=1, max_value=8, value=5))
+    elif trace_mode == "Every k-th subtree":
+        policy = EveryKthSubtree(st.sidebar.number_input("k", min_value=2, max_value=10, value=2))
+    elif trace_mode == "Reservoir sample":
+        policy = ReservoirSample(st.sidebar.number_input("Sample size", min_value=5, max_value=250, value=30), seed=0)
+
+# Input Parameters (every tracing mode above caps the recorded tree, so larger inputs are allowed)
 n = 5
 if algo_name == "Fibonacci":
-    n = st.sidebar.number_input("n (0-10)", min_value=0, max_value=10, value=4)
+    max_n = 10 if policy is None else 25
+    n = st.sidebar.number_input(f"n (0-{max_n})", min_value=0, max_value=max_n, value=4)
 elif algo_name == "Factorial":
-    n = st.sidebar.number_input("n (0-10)", min_value=0, max_value=10, value=5)
+    max_n = 10 if policy is None else 300
+    n = st.sidebar.number_input(f"n (0-{max_n})", min_value=0, max_value=max_n, value=5)
 elif algo_name == "Tower of Hanoi":
-    n = st.sidebar.number_input("Disks (1-5)", min_value=1, max_value=5, value=3)
+    n = st.sidebar.number_input(f"Disks (1-{HANOI_MAX_DISKS})", min_value=1, max_value=HANOI_MAX_DISKS, value=3)
+
+# Call tree renderer
+renderer = st.sidebar.radio(
+    "Tree Renderer", ["Graphviz", "Native SVG"], horizontal=True,
+    help="Native SVG lays the tree out in Python and skips the Graphviz layout engine."
+)
 
 # Warnings for large inputs
 if algo_name == "Fibonacci" and n > 6:
-    st.sidebar.warning(f"⚠️ n={n} will generate ~{2*fibonacci(n+1)-1} calls! The graph may be large.")
+    # fib(n+1) computed directly so the warning doesn't run through the tracer
+    fib_a, fib_b = 0, 1
+    for _ in range(n + 1):
+        fib_a, fib_b = fib_b, fib_a + fib_b
+    if policy is None:
+        st.sidebar.warning(f"⚠️ n={n} will generate ~{2*fib_a-1} calls! The graph may be large.")
+    else:
+        st.sidebar.info(f"n={n} makes ~{2*fib_a-1} calls; only the sampled ones are drawn.")
 elif algo_name == "Tower of Hanoi" and n > 4:
     st.sidebar.warning(f"⚠️ {n} disks will require {2**n - 1} moves. The graph will be complex.")
 
+# Debug metrics (panel is filled in at the end of the script, after this rerun's timings)
+show_metrics = st.sidebar.checkbox("🐞 Debug Metrics", help="Show timings, counters and trace memory for this session.")
+metrics.trace_memory = show_metrics
+debug_panel = st.sidebar.container()
+
 # Run Logic
 if st.sidebar.button("▶️ Run Algorithm", type="primary", use_container_width=True):
     # JavaScript to close sidebar
@@ -196,18 +276,27 @@ if st.sidebar.button("▶️ Run Algorithm", type="primary", use_container_width
         width=0
     )
     with st.spinner("Running algorithm..."):
-        tracer.reset()
+        tracer.reset(policy)
         try:
-            if algo_name == "Fibonacci":
-                fibonacci(n)
-            elif algo_name == "Factorial":
-                factorial(n)
-            elif algo_name == "Tower of Hanoi":
-                tower_of_hanoi(n, "A", "C", "B")
+            # tracemalloc slows tracing several-fold, so those runs are timed separately
+            trace_timer = "trace_with_tracemalloc" if metrics.trace_memory else "trace"
+            with metrics.track_memory("trace"), metrics.timer(trace_timer):
+                if algo_name == "Fibonacci":
+                    fibonacci(n)
+                elif algo_name == "Factorial":
+                    factorial(n)
+                elif algo_name == "Tower of Hanoi":
+                    tower_of_hanoi(n, "A", "C", "B")
+            metrics.incr("runs")
+            metrics.set_gauge("trace_calls", len(tracer.calls))
+            metrics.set_gauge("executed_calls", tracer.next_id)
+            metrics.set_gauge("trace_events", len(tracer.events))
                 
             st.session_state.trace_calls = tracer.calls
             st.session_state.trace_events = tracer.events
             st.session_state.total_steps = len(tracer.events)
+            with metrics.timer("timeline_index"):
+                st.session_state.timeline = TimelineIndex(tracer.events)
             st.session_state.current_step = 0 
             st.session_state.run_id = f"{algo_name}_{n}"
             time.sleep(0.5) # UX pause
@@ -219,6 +308,33 @@ def first_step(): st.session_state.current_step = 0
 def prev_step(): st.session_state.current_step = max(0, st.session_state.current_step - 1)
 def next_step(): st.session_state.current_step = min(st.session_state.total_steps, st.session_state.current_step + 1)
 def last_step(): st.session_state.current_step = st.session_state.total_steps
+def minimap_key(): return f"minimap_{st.session_state.get('minimap_seeks', 0)}"
+def seek_from_minimap():
+    points = st.session_state[minimap_key()].selection.get("seek", [])
+    if points:
+        st.session_state.current_step = int(points[0]["step"])
+        # A fresh key drops the chart's selection, so clicking the same bar again still seeks
+        st.session_state.minimap_seeks = st.session_state.get("minimap_seeks", 0) + 1
+
+# --- Timeline Minimap ---
+MINIMAP_BUCKETS = 200
+
+def minimap_chart(timeline, current_step):
+    """Bar strip of max stack depth over time; clicking a bar seeks to its first step."""
+    steps, depths = timeline.downsample(MINIMAP_BUCKETS)
+    bounds = list(steps[1:]) + [timeline.total_steps + 1]
+    rows = [
+        {"step": int(start), "end": int(end), "depth": int(depth), "current": bool(start <= current_step < end)}
+        for start, end, depth in zip(steps, bounds, depths)
+    ]
+    seek = alt.selection_point(name="seek", fields=["step"], on="click")
+    return alt.Chart(alt.Data(values=rows)).mark_bar(binSpacing=0).encode(
+        x=alt.X("step:Q", axis=None, scale=alt.Scale(domain=[0, timeline.total_steps + 1])),
+        x2="end:Q",
+        y=alt.Y("depth:Q", axis=None),
+        color=alt.condition("datum.current", alt.value("#007bff"), alt.value("#cce5ff")),
+        tooltip=[alt.Tooltip("step:Q", title="From step"), alt.Tooltip("depth:Q", title="Max depth")],
+    ).add_params(seek).properties(height=60)
 
 # --- Code Highlighting Logic ---
 def get_highlighted_code(func, algo_name, event=None, call_info=None):
@@ -334,6 +450,30 @@ with col_info:
     
     with st.expander("💡 Key Insight", expanded=False):
         st.info(info['insight'])
+
+    with st.expander("📈 Empirical Complexity", expanded=False):
+        lo, hi = info['sweep_range']
+        sweep_ns = st.slider("Input range (n)", lo, hi, (lo, min(hi, lo + 15)), key=f"sweep_range_{algo_name}")
+        sweep_metric = st.selectbox("Metric", METRICS, key="sweep_metric")
+        if st.button("Run Sweep", use_container_width=True):
+            with st.spinner("Tracing across worker processes..."), metrics.timer("sweep"):
+                st.session_state[f"sweep_{algo_name}"] = sweep(algo_name, range(sweep_ns[0], sweep_ns[1] + 1))
+
+        results = st.session_state.get(f"sweep_{algo_name}")
+        if results:
+            ns = [r["n"] for r in results]
+            values = [r[sweep_metric] for r in results]
+            claimed = "linear" if sweep_metric == "max_depth" else info['growth']
+            fit = fit_growth(ns, values, claimed)
+            st.line_chart({"n": ns, "observed": values, f"fit ({claimed})": fit["fitted"]}, x="n")
+
+            summary = f"<b>Claimed ({claimed}) fit:</b> R² = {fit['r_squared']:.4f}"
+            growth = empirical_growth(ns, values)
+            if growth:
+                summary += (f"<br><b>Observed:</b> ≈ {growth['base']:.3f}ⁿ (R² = {growth['base_r_squared']:.4f})"
+                            f" | ≈ n^{growth['exponent']:.2f} (R² = {growth['exponent_r_squared']:.4f})")
+            st.markdown(f'<div class="info-box">{summary}</div>', unsafe_allow_html=True)
+            st.dataframe(results, hide_index=True, use_container_width=True)
     
     # 2. Code Display with Highlight
     st.subheader("💻 Live Code")
@@ -360,7 +500,9 @@ with col_info:
         
         # Progress Bar
         st.progress(step / total if total > 0 else 0)
-        st.caption(f"Step {step} of {total}")
+        timeline = st.session_state.timeline
+        st.caption(f"Step {step} of {total} · Depth {timeline.depth[step]} "
+                   f"(max so far {timeline.max_depth(0, step)}) · {timeline.completed[step]} calls returned")
 
         if step > 0:
             # Narrative generation
@@ -390,8 +532,20 @@ with col_info:
                 st.markdown("**Current State:**")
                 # Get the initial n value from session state
                 initial_n = st.session_state.trace_calls[0]['args'][0]
-                hanoi_state = get_hanoi_state_at_step(initial_n, events, calls, step)
-                st.markdown(hanoi_state.render_html(), unsafe_allow_html=True)
+                with metrics.timer("hanoi_reconstruct"):
+                    hanoi_state = get_hanoi_state_at_step(initial_n, events, calls, step)
+
+                # When stepping by one, outline the disk(s) that event moved
+                moved = ()
+                prev_view = st.session_state.get("hanoi_view")
+                if prev_view and prev_view[0] == st.session_state.run_id and abs(prev_view[1] - step) == 1:
+                    moved = hanoi_state.changed_disks(prev_view[2])
+                st.session_state.hanoi_view = (st.session_state.run_id, step, hanoi_state)
+
+                with metrics.timer("hanoi_render_html"):
+                    hanoi_html = hanoi_state.render_html(include_stylesheet=False, highlight=moved)
+                metrics.set_gauge("hanoi_html_bytes", len(hanoi_html))
+                st.markdown(hanoi_html, unsafe_allow_html=True)
             
             if step == total:
                 st.markdown("""
@@ -422,6 +576,10 @@ with col_viz:
     st.subheader("🌳 Call Tree")
     
     if "trace_events" in st.session_state:
+        # Minimap (click to seek)
+        st.altair_chart(minimap_chart(st.session_state.timeline, st.session_state.current_step),
+                        use_container_width=True, on_select=seek_from_minimap, key=minimap_key())
+
         # Navigation
         c1, c2, c3, c4, c5 = st.columns([1, 1, 4, 1, 1])
         
@@ -436,8 +594,16 @@ with col_viz:
         with c5: st.button("⏭️", on_click=last_step, disabled=is_end, help="Last Step", use_container_width=True)
 
         # Graph
-        dot = generate_dot(st.session_state.trace_calls, st.session_state.trace_events, st.session_state.current_step)
-        st.graphviz_chart(dot, use_container_width=True)
+        if renderer == "Native SVG":
+            with metrics.timer("generate_svg"):
+                svg = generate_svg(st.session_state.trace_calls, st.session_state.trace_events, st.session_state.current_step)
+            st.markdown(f'<div class="native-tree">{svg}</div>', unsafe_allow_html=True)
+        else:
+            with metrics.timer("generate_dot"):
+                dot = generate_dot(st.session_state.trace_calls, st.session_state.trace_events, st.session_state.current_step)
+            # Only covers handing the DOT source to Streamlit; the browser does the layout
+            with metrics.timer("graphviz_chart_send"):
+                st.graphviz_chart(dot, use_container_width=True)
         
     else:
         # Improved Empty State
@@ -464,3 +630,21 @@ with col_viz:
             </p>
         </div>
         """, unsafe_allow_html=True)
+
+# --- Debug Metrics Panel ---
+if show_metrics:
+    with debug_panel:
+        with st.expander("📊 Hot-Path Metrics", expanded=True):
+            rows = metrics.rows()
+            if rows:
+                st.dataframe(rows, hide_index=True, use_container_width=True)
+            else:
+                st.caption("No timings recorded yet.")
+            for name, value in {**metrics.counters, **metrics.gauges}.items():
+                if name.endswith("_bytes"):
+                    value = f"{value / 1024:,.1f} KiB"
+                st.caption(f"**{name}**: {value}")
+            d1, d2 = st.columns(2)
+            with d1: st.download_button("Prometheus", metrics.to_prometheus(), file_name="metrics.prom", mime="text/plain", use_container_width=True)
+            with d2: st.download_button("JSON", metrics.to_json(), file_name="metrics.json", mime="application/json", use_container_width=True)
+            st.button("Reset Metrics", on_click=metrics.reset, use_container_width=True)
@@ -0,0 +1,62 @@
+"""
+Frame-time benchmark: Graphviz (`generate_dot` + `dot` layout) vs. the native SVG renderer.
+
+The app never runs `dot`: `st.graphviz_chart` only ships the DOT source and the
+browser lays it out. Piping through the `dot` binary here is a server-side stand-in
+for that browser-side layout cost, so the speedup is indicative, not what users see.
+Skipped when `dot` is not installed.
+
+Usage:
+    python -m benchmarks.bench_renderers
+"""
+import time
+
+import graphviz
+
+from algorithms import fibonacci, factorial, tower_of_hanoi, tracer
+from visualizers import generate_dot, generate_svg
+
+CASES = [
+    ("Fibonacci", fibonacci, (6,)),
+    ("Fibonacci", fibonacci, (10,)),
+    ("Factorial", factorial, (10,)),
+    ("Tower of Hanoi", tower_of_hanoi, (5, "A", "C", "B")),
+]
+FRAMES = 20  # Evenly spaced steps sampled per trace
+
+
+def render_graphviz(calls, events, step):
+    return generate_dot(calls, events, step).pipe(format="svg")
+
+
+def time_frames(render, calls, events):
+    total = len(events)
+    steps = sorted({round(i * total / (FRAMES - 1)) for i in range(FRAMES)})
+    start = time.perf_counter()
+    for step in steps:
+        render(calls, events, step)
+    return (time.perf_counter() - start) / len(steps) * 1000
+
+
+def main():
+    print(f"{'case':<24}{'events':>8}{'graphviz ms':>14}{'native ms':>12}{'speedup':>10}")
+    for name, func, args in CASES:
+        tracer.reset()
+        func(*args)
+        calls, events = tracer.calls, tracer.events
+
+        native_ms = time_frames(generate_svg, calls, events)
+        try:
+            graphviz_ms = time_frames(render_graphviz, calls, events)
+        except graphviz.ExecutableNotFound:
+            graphviz_ms = None
+
+        label = f"{name}({args[0]})"
+        if graphviz_ms is None:
+            print(f"{label:<24}{len(events):>8}{'n/a (no dot)':>14}{native_ms:>12.2f}{'':>10}")
+        else:
+            print(f"{label:<24}{len(events):>8}{graphviz_ms:>14.2f}{native_ms:>12.2f}{graphviz_ms / native_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Lightweight timers, counters and memory gauges for the app's hot paths"""
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# tracemalloc is process-wide while Metrics are per session (and sessions run on
+# separate threads), so starting/stopping it is reference-counted under a lock.
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_owned = False  # Whether we started it (and so may stop it)
+
+
+def _acquire_tracemalloc():
+    """Starts tracemalloc for the first user; resets the peak when there is no other user."""
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc_owned = True
+        _tracemalloc_users += 1
+        if _tracemalloc_users == 1:
+            tracemalloc.reset_peak()
+
+
+def _release_tracemalloc():
+    """Reads (current, peak) and stops tracemalloc once the last user is done."""
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        current, peak = tracemalloc.get_traced_memory()
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and _tracemalloc_owned:
+            tracemalloc.stop()
+            _tracemalloc_owned = False
+        return current, peak
+
+
+class Metrics:
+    def __init__(self, prefix="recviz"):
+        self.prefix = prefix
+        self.trace_memory = False  # tracemalloc is costly, so memory tracking is opt-in
+        self.reset()
+
+    def reset(self):
+        self.timers = {}    # name -> {"count", "total", "max", "last"} (seconds)
+        self.counters = {}  # name -> int
+        self.gauges = {}    # name -> number
+
+    def observe(self, name, seconds):
+        stats = self.timers.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0, "last": 0.0})
+        stats["count"] += 1
+        stats["total"] += seconds
+        stats["max"] = max(stats["max"], seconds)
+        stats["last"] = seconds
+
+    def incr(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_gauge(self, name, value):
+        self.gauges[name] = value
+
+    @contextmanager
+    def timer(self, name):
+        """Times the enclosed block and records it under `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    @contextmanager
+    def track_memory(self, name):
+        """
+        Records memory allocated (and still held) by the enclosed block as the
+        `<name>_bytes` gauge, and its allocation peak as `<name>_peak_bytes`.
+        No-op unless `trace_memory` is enabled.
+
+        tracemalloc counts the whole process: if another session is inside a tracked
+        block at the same time, its allocations are included too. Gauges are clamped
+        at 0, and the peak is only reset when no other block is in progress.
+        """
+        if not self.trace_memory:
+            yield
+            return
+
+        _acquire_tracemalloc()
+        before, _ = tracemalloc.get_traced_memory()
+        try:
+            yield
+        finally:
+            current, peak = _release_tracemalloc()
+            self.set_gauge(f"{name}_bytes", max(0, current - before))
+            self.set_gauge(f"{name}_peak_bytes", max(0, peak - before))
+
+    def rows(self):
+        """Timer summaries in milliseconds, slowest total first."""
+        rows = [
+            {
+                "operation": name,
+                "count": s["count"],
+                "total_ms": round(s["total"] * 1000, 3),
+                "mean_ms": round(s["total"] / s["count"] * 1000, 3),
+                "max_ms": round(s["max"] * 1000, 3),
+                "last_ms": round(s["last"] * 1000, 3),
+            }
+            for name, s in self.timers.items()
+        ]
+        return sorted(rows, key=lambda r: r["total_ms"], reverse=True)
+
+    def to_json(self):
+        return json.dumps({"timers": self.timers, "counters": self.counters, "gauges": self.gauges}, indent=2)
+
+    def to_prometheus(self):
+        """Renders all metrics in the Prometheus text exposition format."""
+        p = self.prefix
+        lines = []
+        if self.timers:
+            lines.append(f"# TYPE {p}_duration_seconds summary")
+            for name, s in self.timers.items():
+                lines.append(f'{p}_duration_seconds_count{{op="{name}"}} {s["count"]}')
+                lines.append(f'{p}_duration_seconds_sum{{op="{name}"}} {s["total"]:.9f}')
+            lines.append(f"# TYPE {p}_duration_seconds_max gauge")
+            for name, s in self.timers.items():
+                lines.append(f'{p}_duration_seconds_max{{op="{name}"}} {s["max"]:.9f}')
+        for name, value in self.counters.items():
+            lines.append(f"# TYPE {p}_{name}_total counter")
+            lines.append(f"{p}_{name}_total {value}")
+        for name, value in self.gauges.items():
+            lines.append(f"# TYPE {p}_{name} gauge")
+            lines.append(f"{p}_{name} {value}")
+        return "\n".join(lines) + "\n"
@@ -1 +1,2 @@
 from .call_tree import generate_dot
+from .svg_tree import generate_svg
@@ -1,5 +1,7 @@
 import graphviz
 
+from .tree_state import NODE_COLORS, FONT_COLOR, replay_events, node_label, node_state
+
 def generate_dot(calls, events, step):
     """
     Generates a Graphviz Digraph for the recursion state at a specific step.
@@ -18,74 +20,17 @@ def generate_dot(calls, events, step):
     dot.attr(fontsize='10')
 
     
-    # Track state
-    active_calls = set()
-    completed_calls = set()
-    visible_calls = set()
-    
-    # Replay events
-    current_events = events[:step]
-    
-    last_active_call = None
-    
-    for event in current_events:
-        cid = event["call_id"]
-        if event["type"] == "start":
-            active_calls.add(cid)
-            visible_calls.add(cid)
-            last_active_call = cid
-        elif event["type"] == "end":
-            if cid in active_calls:
-                active_calls.remove(cid)
-            completed_calls.add(cid)
-            last_active_call = cid # The one that just ended is "active" in terms of attention
-            
+    active_calls, completed_calls, visible_calls, focus = replay_events(events, step)
+
     for cid in visible_calls:
         call = calls[cid]
-        
-        # Construct Label
-        args_str = ", ".join([str(a) for a in call["args"]])
-        # Handle kwargs if any (though our algos mostly don't use them)
-        if call["kwargs"]:
-            kwargs_str = ", ".join([f"{k}={v}" for k, v in call["kwargs"].items()])
-            if args_str:
-                args_str += ", " + kwargs_str
-            else:
-                args_str = kwargs_str
-                
-        label = f"{call['func_name']}({args_str})"
-        
-        # Add return value if completed AND processed as an end event
-        # Note: A call is in completed_calls only if we processed its 'end' event.
-        if cid in completed_calls:
-            ret = call["return_value"]
-            ret_str = str(ret)
-            if len(ret_str) > 20:
-                ret_str = ret_str[:17] + "..."
-            label += f"\nReturn: {ret_str}"
-            
+        label = node_label(call, cid in completed_calls)
+
         # Styling
-        color = "black"
-        style = "solid"
-        fillcolor = "white"
-        fontcolor = "black"
-        
-        if cid in completed_calls:
-            color = "#28a745" # Green
-            fillcolor = "#d4edda"
-            style = "filled"
-        elif cid in active_calls:
-            color = "#007bff" # Blue
-            fillcolor = "#cce5ff"
-            style = "filled"
-            
-        # Highlight the very last event processed (focus)
-        if step > 0 and cid == current_events[-1]["call_id"]:
-            penwidth = "3.0"
-        else:
-            penwidth = "1.0"
-            
-        dot.node(str(cid), label=label, color=color, style=style, fillcolor=fillcolor, fontcolor=fontcolor, penwidth=penwidth)
+        color, fillcolor, style = NODE_COLORS[node_state(cid, active_calls, completed_calls)]
+        penwidth = "3.0" if cid == focus else "1.0"
+
+        dot.node(str(cid), label=label, color=color, style=style, fillcolor=fillcolor, fontcolor=FONT_COLOR, penwidth=penwidth)
         
         # Edge
         pid = call["parent_id"]
@@ -1,4 +1,74 @@
 """Tower of Hanoi state visualizer"""
+import functools
+
+MAX_WIDTH = 120
+DISK_HEIGHT = 20
+BASE_HEIGHT = 8
+ROD_WIDTH = 4
+RODS = ('A', 'B', 'C')
+
+# Size-independent rules, shared by every Hanoi view
+HANOI_CSS = f"""
+.hanoi {{ display: flex; justify-content: space-around; align-items: flex-end; padding: 15px; background: linear-gradient(to bottom, #e3f2fd 0%, #fff 100%); border-radius: 8px; max-width: 100%; margin: 10px 0; }}
+.hanoi-rod {{ display: flex; flex-direction: column; align-items: center; flex: 1; margin: 0 5px; }}
+.hanoi-label {{ font-weight: bold; font-size: 14px; margin-bottom: 5px; color: #1976d2; }}
+.hanoi-tower {{ position: relative; width: {MAX_WIDTH + 20}px; display: flex; flex-direction: column-reverse; align-items: center; }}
+.hanoi-pole {{ position: absolute; bottom: {BASE_HEIGHT}px; left: 50%; transform: translateX(-50%); width: {ROD_WIDTH}px; background: linear-gradient(to bottom, #8d6e63 0%, #5d4037 100%); border-radius: 2px; box-shadow: 1px 1px 3px rgba(0,0,0,0.2); z-index: 0; }}
+.hanoi-base {{ width: {MAX_WIDTH + 20}px; height: {BASE_HEIGHT}px; background: linear-gradient(to bottom, #6d4c41 0%, #4e342e 100%); border-radius: 4px; margin-top: 5px; box-shadow: 0 2px 4px rgba(0,0,0,0.3); }}
+.hanoi-disk {{ position: absolute; left: 50%; transform: translateX(-50%); height: {DISK_HEIGHT - 2}px; border: 2px solid; border-radius: 4px; display: flex; align-items: center; justify-content: center; font-weight: bold; font-size: 12px; color: white; text-shadow: 1px 1px 2px rgba(0,0,0,0.5); box-shadow: 0 2px 4px rgba(0,0,0,0.3); }}
+.hanoi-disk.hanoi-moved {{ outline: 3px solid #ff9800; outline-offset: 1px; }}
+"""
+
+
+@functools.lru_cache(maxsize=None)
+def _size_rules(n_disks):
+    """Rod height and one class per disk size (width, colour), scoped to n-disk views"""
+    rod_height = n_disks * DISK_HEIGHT + 20
+    scope = f".hanoi-n{n_disks}"
+    rules = [
+        f"{scope} .hanoi-tower {{ height: {rod_height}px; }}",
+        f"{scope} .hanoi-pole {{ height: {rod_height - BASE_HEIGHT}px; }}",
+    ]
+    for disk_size in range(1, n_disks + 1):
+        disk_width = (MAX_WIDTH * 0.9) * (disk_size / n_disks) + (MAX_WIDTH * 0.1)
+        # Color gradient based on disk size
+        hue = 200 + (disk_size / n_disks) * 60  # Blue to cyan spectrum
+        rules.append(
+            f"{scope} .hd-{disk_size} {{ width: {disk_width}px; "
+            f"background: linear-gradient(135deg, hsl({hue}, 70%, 50%) 0%, hsl({hue}, 70%, 60%) 100%); "
+            f"border-color: hsl({hue}, 70%, 30%); }}"
+        )
+    return "\n".join(rules)
+
+
+@functools.lru_cache(maxsize=None)
+def hanoi_stylesheet(max_disks):
+    """
+    The <style> block for every view with 1..max_disks disks: the shared rules, the
+    per-size rules of each n, and one class per stack slot (height). Inject it once per
+    page, ahead of any `render_html(include_stylesheet=False)` markup.
+    """
+    rules = [HANOI_CSS]
+    rules.extend(_size_rules(n) for n in range(1, max_disks + 1))
+    for slot in range(max_disks):
+        rules.append(f".hs-{slot} {{ bottom: {BASE_HEIGHT + slot * DISK_HEIGHT}px; z-index: {slot + 1}; }}")
+    return "<style>" + "\n".join(rules) + "</style>"
+
+
+@functools.lru_cache(maxsize=None)
+def _disk_fragment(disk_size, slot, moved=False):
+    extra = " hanoi-moved" if moved else ""
+    return f'<div class="hanoi-disk hd-{disk_size} hs-{slot}{extra}" data-disk="{disk_size}">{disk_size}</div>'
+
+
+@functools.lru_cache(maxsize=None)
+def _rod_open(rod_name):
+    return (f'<div class="hanoi-rod" data-rod="{rod_name}"><div class="hanoi-label">Rod {rod_name}</div>'
+            f'<div class="hanoi-tower"><div class="hanoi-pole"></div>')
+
+
+_ROD_CLOSE = '</div><div class="hanoi-base"></div></div>'
+
 
 class HanoiState:
     def __init__(self, n_disks):
@@ -15,71 +85,52 @@ class HanoiState:
         if self.rods[source]:
             disk = self.rods[source].pop()
             self.rods[target].append(disk)
-    
-    def render_html(self):
-        """Render the current state as HTML"""
-        max_width = 120
-        disk_height = 20
-        base_height = 8
-        rod_width = 4
-        rod_height = self.n_disks * disk_height + 20
-        
-        html = '<div style="display: flex; justify-content: space-around; align-items: flex-end; padding: 15px; background: linear-gradient(to bottom, #e3f2fd 0%, #fff 100%); border-radius: 8px; max-width: 100%; margin: 10px 0;">'
-        
-        for rod_name in ['A', 'B', 'C']:
-            disks = self.rods[rod_name]
-            
-            # Rod container
-            html += '<div style="display: flex; flex-direction: column; align-items: center; flex: 1; margin: 0 5px;">'
-            
-            # Rod label at top
-            html += f'<div style="font-weight: bold; font-size: 14px; margin-bottom: 5px; color: #1976d2;">Rod {rod_name}</div>'
-            
-            # Tower container with rod and disks
-            html += f'<div style="position: relative; width: {max_width + 20}px; height: {rod_height}px; display: flex; flex-direction: column-reverse; align-items: center;">'
-            
-            # Rod pole (vertical bar in center)
-            html += f'<div style="position: absolute; bottom: {base_height}px; left: 50%; transform: translateX(-50%); width: {rod_width}px; height: {rod_height - base_height}px; background: linear-gradient(to bottom, #8d6e63 0%, #5d4037 100%); border-radius: 2px; box-shadow: 1px 1px 3px rgba(0,0,0,0.2); z-index: 0;"></div>'
-            
+
+    def positions(self):
+        """Map disk size -> (rod, slot), slot 0 being the bottom of the rod"""
+        return {disk: (rod, slot) for rod, disks in self.rods.items() for slot, disk in enumerate(disks)}
+
+    def changed_disks(self, prev):
+        """
+        Disks whose (rod, slot) differs from `prev`. One replay step can move two disks:
+        the `end` event that finishes a parent's first sub-call moves both disk 1 and
+        the parent's disk (see get_hanoi_state_at_step).
+        """
+        before = prev.positions()
+        return {disk: pos for disk, pos in self.positions().items() if before.get(disk) != pos}
+
+    def render_html(self, include_stylesheet=True, highlight=()):
+        """
+        Render the current state as class-based HTML.
+
+        Args:
+            include_stylesheet (bool): Prepend `hanoi_stylesheet`; pass False when it
+                has already been injected on the page.
+            highlight (iterable): Disk sizes to outline (e.g. the disk that just moved)
+        """
+        parts = [hanoi_stylesheet(self.n_disks)] if include_stylesheet else []
+        parts.append(f'<div class="hanoi hanoi-n{self.n_disks}">')
+        for rod_name in RODS:
+            parts.append(_rod_open(rod_name))
             # Disks (from bottom to top in the list, so we iterate normally)
-            disk_bottom = base_height
-            for i, disk_size in enumerate(disks):
-                disk_width = (max_width * 0.9) * (disk_size / self.n_disks) + (max_width * 0.1)
-                # Color gradient based on disk size
-                hue = 200 + (disk_size / self.n_disks) * 60  # Blue to cyan spectrum
-                
-                html += f'''<div style="
-                    position: absolute;
-                    bottom: {disk_bottom}px;
-                    left: 50%;
-                    transform: translateX(-50%);
-                    width: {disk_width}px;
-                    height: {disk_height - 2}px;
-                    background: linear-gradient(135deg, hsl({hue}, 70%, 50%) 0%, hsl({hue}, 70%, 60%) 100%);
-                    border: 2px solid hsl({hue}, 70%, 30%);
-                    border-radius: 4px;
-                    display: flex;
-                    align-items: center;
-                    justify-content: center;
-                    font-weight: bold;
-                    font-size: 12px;
-                    color: white;
-                    text-shadow: 1px 1px 2px rgba(0,0,0,0.5);
-                    box-shadow: 0 2px 4px rgba(0,0,0,0.3);
-                    z-index: {i + 1};
-                ">{disk_size}</div>'''
-                
-                disk_bottom += disk_height
-            
-            html += '</div>'  # Close tower container
-            
-            # Base
-            html += f'<div style="width: {max_width + 20}px; height: {base_height}px; background: linear-gradient(to bottom, #6d4c41 0%, #4e342e 100%); border-radius: 4px; margin-top: 5px; box-shadow: 0 2px 4px rgba(0,0,0,0.3);"></div>'
-            
-            html += '</div>'  # Close rod container
-        
-        html += '</div>'  # Close main container
-        return html
+            parts.extend(_disk_fragment(disk, slot, disk in highlight) for slot, disk in enumerate(self.rods[rod_name]))
+            parts.append(_ROD_CLOSE)
+        parts.append('</div>')
+        return "".join(parts)
+
+    def render_patch(self, prev):
+        """
+        Render only what changed since `prev`: one entry per moved disk with its
+        destination rod and its new fragment, for clients that keep the previous markup
+        (remove `[data-disk=N]`, append `html` to the `[data-rod=rod] .hanoi-tower`).
+
+        Library-only: the Streamlit app re-sends whole markdown elements, so it always
+        uses `render_html`.
+        """
+        return [
+            {"disk": disk, "rod": rod, "html": _disk_fragment(disk, slot)}
+            for disk, (rod, slot) in self.changed_disks(prev).items()
+        ]
 
 
 def get_hanoi_state_at_step(n_disks, events, calls, current_step):
@@ -0,0 +1,82 @@
+"""Native SVG call-tree renderer (no Graphviz / `dot` process required)"""
+from xml.sax.saxutils import escape
+
+from .tree_layout import tidy_layout
+from .tree_state import NODE_COLORS, FONT_COLOR, replay_events, node_label, node_state
+
+FONT_SIZE = 12
+CHAR_WIDTH = 7.2    # Approximate advance of a 12px sans-serif glyph
+LINE_HEIGHT = 15
+NODE_PADDING = 24
+H_GAP = 16
+V_GAP = 40
+MARGIN = 8
+
+
+def iter_svg(calls, events, step):
+    """
+    Streams the SVG for the recursion state at a specific step, chunk by chunk.
+
+    Uses the same colours, labels and focus highlight as `generate_dot`, laid out
+    with `tidy_layout` instead of Graphviz.
+
+    Args:
+        calls (dict): Dictionary of call_id -> call_info
+        events (list): List of event dictionaries
+        step (int): Number of events to process (0 to len(events))
+    """
+    active_calls, completed_calls, visible_calls, focus = replay_events(events, step)
+
+    labels = {cid: node_label(calls[cid], cid in completed_calls).split("\n") for cid in visible_calls}
+    max_chars = max((len(line) for lines in labels.values() for line in lines), default=0)
+    max_lines = max((len(lines) for lines in labels.values()), default=1)
+
+    # Uniform node size keeps the layout's unit spacing valid
+    node_w = max_chars * CHAR_WIDTH + NODE_PADDING
+    node_h = max_lines * LINE_HEIGHT + NODE_PADDING // 2
+    col_w = node_w + H_GAP
+    row_h = node_h + V_GAP
+
+    positions = tidy_layout(calls, visible_calls)
+    centers = {
+        cid: (MARGIN + node_w / 2 + x * col_w, MARGIN + node_h / 2 + depth * row_h)
+        for cid, (x, depth) in positions.items()
+    }
+    width = max((cx for cx, _ in centers.values()), default=0) + node_w / 2 + MARGIN
+    height = max((cy for _, cy in centers.values()), default=0) + node_h / 2 + MARGIN
+
+    yield (f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}" height="{height:.0f}" '
+           f'viewBox="0 0 {width:.0f} {height:.0f}" font-family="Helvetica, Arial, sans-serif" '
+           f'font-size="{FONT_SIZE}">')
+
+    # Edges first so nodes paint over them
+    yield '<g stroke="black" stroke-width="1">'
+    for cid in visible_calls:
+        pid = calls[cid]["parent_id"]
+        if pid is not None and pid in visible_calls:
+            px, py = centers[pid]
+            cx, cy = centers[cid]
+            yield f'<line x1="{px:.1f}" y1="{py + node_h / 2:.1f}" x2="{cx:.1f}" y2="{cy - node_h / 2:.1f}"/>'
+    yield '</g>'
+
+    for cid in sorted(visible_calls):
+        cx, cy = centers[cid]
+        color, fillcolor, style = NODE_COLORS[node_state(cid, active_calls, completed_calls)]
+        fill = fillcolor if style == "filled" else "none"
+        penwidth = 3 if cid == focus else 1
+        yield (f'<ellipse cx="{cx:.1f}" cy="{cy:.1f}" rx="{node_w / 2:.1f}" ry="{node_h / 2:.1f}" '
+               f'fill="{fill}" stroke="{color}" stroke-width="{penwidth}"/>')
+
+        lines = labels[cid]
+        top = cy - (len(lines) - 1) * LINE_HEIGHT / 2
+        yield f'<text x="{cx:.1f}" text-anchor="middle" dominant-baseline="central" fill="{FONT_COLOR}">'
+        for i, line in enumerate(lines):
+            yield f'<tspan x="{cx:.1f}" y="{top + i * LINE_HEIGHT:.1f}">{escape(line)}</tspan>'
+        yield '</text>'
+
+    yield '</svg>'
+
+
+def generate_svg(calls, events, step):
+    """Renders the recursion state at a specific step as an SVG string."""
+    return "".join(iter_svg(calls, events, step))
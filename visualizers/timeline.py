@@ -0,0 +1,82 @@
+"""Prefix-sum index over a trace's timeline, for O(1) range queries and the minimap"""
+import numpy as np
+
+
+class TimelineIndex:
+    """
+    Per-step prefix arrays for a list of trace events.
+
+    Index s describes the state after the first s events (the app's `current_step`),
+    so every array has len(events) + 1 entries:
+        depth:     stack depth
+        starts:    calls started so far
+        ends:      calls returned so far (i.e. completed calls)
+
+    Range maxima use a sparse table over fixed-size blocks plus in-block prefix/suffix
+    maxima: O(n) memory and O(1) per query.
+    """
+    BLOCK = 64
+
+    def __init__(self, events):
+        is_start = np.fromiter((e["type"] == "start" for e in events), dtype=np.int32, count=len(events))
+        self.total_steps = len(events)
+
+        self.starts = np.zeros(self.total_steps + 1, dtype=np.int64)
+        np.cumsum(is_start, out=self.starts[1:])
+        self.ends = np.arange(self.total_steps + 1, dtype=np.int64) - self.starts
+        self.completed = self.ends
+        self.depth = (self.starts - self.ends).astype(np.int32)
+
+        self._build_range_max()
+
+    def _build_range_max(self):
+        size = len(self.depth)
+        n_blocks = -(-size // self.BLOCK)
+        padded = np.zeros(n_blocks * self.BLOCK, dtype=self.depth.dtype)  # Depth >= 0, so 0-padding is neutral
+        padded[:size] = self.depth
+        blocks = padded.reshape(n_blocks, self.BLOCK)
+
+        self._prefix_max = np.maximum.accumulate(blocks, axis=1).ravel()[:size]
+        self._suffix_max = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()[:size]
+
+        # _sparse[k][i] = max of block maxima i .. i + 2**k - 1
+        self._sparse = [blocks.max(axis=1)]
+        span = 1
+        while span * 2 <= n_blocks:
+            prev = self._sparse[-1]
+            self._sparse.append(np.maximum(prev[:-span], prev[span:]))
+            span *= 2
+
+    def max_depth(self, a, b):
+        """Maximum stack depth over steps a..b (inclusive)."""
+        if a > b:
+            a, b = b, a
+        block_a, block_b = a // self.BLOCK, b // self.BLOCK
+        if block_a == block_b:
+            return int(self.depth[a:b + 1].max())
+
+        result = max(self._suffix_max[a], self._prefix_max[b])
+        if block_b - block_a > 1:
+            lo, hi = block_a + 1, block_b - 1
+            k = (hi - lo + 1).bit_length() - 1
+            level = self._sparse[k]
+            result = max(result, level[lo], level[hi - (1 << k) + 1])
+        return int(result)
+
+    def starts_between(self, a, b):
+        """Calls started by events a+1..b, i.e. while stepping from a to b."""
+        return int(self.starts[b] - self.starts[a])
+
+    def ends_between(self, a, b):
+        """Calls returned by events a+1..b, i.e. while stepping from a to b."""
+        return int(self.ends[b] - self.ends[a])
+
+    def downsample(self, buckets):
+        """
+        Max depth per bucket of consecutive steps, for drawing the minimap.
+
+        Returns:
+            tuple: (first step of each bucket, max depth in that bucket) as arrays
+        """
+        edges = np.unique(np.linspace(0, len(self.depth), buckets + 1).astype(np.int64)[:-1])
+        return edges, np.maximum.reduceat(self.depth, edges)
@@ -0,0 +1,192 @@
+"""Tidy tree layout (Reingold-Tilford, in Buchheim et al.'s linear-time form)"""
+
+
+class _LayoutNode:
+    __slots__ = ("cid", "parent", "children", "number", "x", "mod", "thread",
+                 "ancestor", "change", "shift")
+
+    def __init__(self, cid, parent, number):
+        self.cid = cid
+        self.parent = parent
+        self.children = []
+        self.number = number  # Index among siblings
+        self.x = 0.0
+        self.mod = 0.0
+        self.thread = None
+        self.ancestor = self
+        self.change = 0.0
+        self.shift = 0.0
+
+    def left(self):
+        return self.thread or (self.children[0] if self.children else None)
+
+    def right(self):
+        return self.thread or (self.children[-1] if self.children else None)
+
+    def left_brother(self):
+        if self.parent is None or self.number == 0:
+            return None
+        return self.parent.children[self.number - 1]
+
+    def leftmost_sibling(self):
+        if self.parent is None or self.number == 0:
+            return None
+        return self.parent.children[0]
+
+
+def _build(calls, visible_calls):
+    """Links visible calls into layout trees, children ordered by call id (i.e. call order)."""
+    nodes = {}
+    roots = []
+    for cid in sorted(visible_calls):
+        pid = calls[cid]["parent_id"]
+        parent = nodes.get(pid) if pid is not None else None
+        if parent is None:
+            node = _LayoutNode(cid, None, len(roots))
+            roots.append(node)
+        else:
+            node = _LayoutNode(cid, parent, len(parent.children))
+            parent.children.append(node)
+        nodes[cid] = node
+    return roots
+
+
+def _first_walk(root, distance):
+    # Explicit stack instead of recursion: frames are [node, next_child_index, default_ancestor]
+    stack = [[root, 0, None]]
+    while stack:
+        frame = stack[-1]
+        v = frame[0]
+        if frame[1] < len(v.children):
+            w = v.children[frame[1]]
+            if frame[1] == 0:
+                frame[2] = w
+            stack.append([w, 0, None])
+            continue
+
+        stack.pop()
+        if not v.children:
+            w = v.left_brother()
+            v.x = w.x + distance if w is not None else 0.0
+        else:
+            _execute_shifts(v)
+            midpoint = (v.children[0].x + v.children[-1].x) / 2
+            w = v.left_brother()
+            if w is not None:
+                v.x = w.x + distance
+                v.mod = v.x - midpoint
+            else:
+                v.x = midpoint
+
+        if stack:
+            parent_frame = stack[-1]
+            parent_frame[2] = _apportion(v, parent_frame[2], distance)
+            parent_frame[1] += 1
+
+
+def _apportion(v, default_ancestor, distance):
+    w = v.left_brother()
+    if w is None:
+        return default_ancestor
+
+    # i = inner, o = outer, r = right contour, l = left contour
+    vir = vor = v
+    vil = w
+    vol = v.leftmost_sibling()
+    sir = sor = v.mod
+    sil = vil.mod
+    sol = vol.mod
+    while vil.right() is not None and vir.left() is not None:
+        vil = vil.right()
+        vir = vir.left()
+        vol = vol.left()
+        vor = vor.right()
+        vor.ancestor = v
+        shift = (vil.x + sil) - (vir.x + sir) + distance
+        if shift > 0:
+            _move_subtree(_ancestor(vil, v, default_ancestor), v, shift)
+            sir += shift
+            sor += shift
+        sil += vil.mod
+        sir += vir.mod
+        sol += vol.mod
+        sor += vor.mod
+
+    if vil.right() is not None and vor.right() is None:
+        vor.thread = vil.right()
+        vor.mod += sil - sor
+    else:
+        if vir.left() is not None and vol.left() is None:
+            vol.thread = vir.left()
+            vol.mod += sir - sol
+        default_ancestor = v
+    return default_ancestor
+
+
+def _move_subtree(wl, wr, shift):
+    subtrees = wr.number - wl.number
+    wr.change -= shift / subtrees
+    wr.shift += shift
+    wl.change += shift / subtrees
+    wr.x += shift
+    wr.mod += shift
+
+
+def _execute_shifts(v):
+    shift = change = 0.0
+    for w in reversed(v.children):
+        w.x += shift
+        w.mod += shift
+        change += w.change
+        shift += w.shift + change
+
+
+def _ancestor(vil, v, default_ancestor):
+    if vil.ancestor.parent is v.parent:
+        return vil.ancestor
+    return default_ancestor
+
+
+def _second_walk(root, positions, offset):
+    """Resolves modifiers into absolute x. Returns the minimum x of the tree."""
+    min_x = None
+    stack = [(root, 0.0, 0)]
+    while stack:
+        v, m, depth = stack.pop()
+        x = v.x + m
+        positions[v.cid] = (x + offset, depth)
+        if min_x is None or x < min_x:
+            min_x = x
+        for w in v.children:
+            stack.append((w, m + v.mod, depth + 1))
+    return min_x
+
+
+def tidy_layout(calls, visible_calls, distance=1.0):
+    """
+    Computes a tidy tree layout for the visible part of a recursion trace.
+
+    Runs in O(n) for n visible calls.
+
+    Args:
+        calls (dict): Dictionary of call_id -> call_info
+        visible_calls (set): Call ids to lay out
+        distance (float): Minimum horizontal gap between neighbouring nodes
+
+    Returns:
+        dict: call_id -> (x, depth), with x >= 0 in units of `distance`
+    """
+    positions = {}
+    offset = 0.0
+    for root in _build(calls, visible_calls):
+        _first_walk(root, distance)
+        tree_positions = {}
+        min_x = _second_walk(root, tree_positions, 0.0)
+        # Shift each tree so its leftmost node sits right of the previous tree
+        max_x = offset
+        for cid, (x, depth) in tree_positions.items():
+            x += offset - min_x
+            positions[cid] = (x, depth)
+            max_x = max(max_x, x)
+        offset = max_x + distance
+    return positions
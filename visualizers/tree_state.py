@@ -0,0 +1,70 @@
+"""Shared call-tree state replay, labels and colour scheme for the tree renderers"""
+
+# (border colour, fill colour, style) per node state
+NODE_COLORS = {
+    "pending": ("black", "white", "solid"),
+    "active": ("#007bff", "#cce5ff", "filled"),     # Blue
+    "completed": ("#28a745", "#d4edda", "filled"),  # Green
+}
+FONT_COLOR = "black"
+
+
+def replay_events(events, step):
+    """
+    Replays the first `step` events.
+
+    Returns:
+        tuple: (active_calls, completed_calls, visible_calls, focus_call_id)
+    """
+    active_calls = set()
+    completed_calls = set()
+    visible_calls = set()
+
+    for event in events[:step]:
+        cid = event["call_id"]
+        if event["type"] == "start":
+            active_calls.add(cid)
+            visible_calls.add(cid)
+        elif event["type"] == "end":
+            if cid in active_calls:
+                active_calls.remove(cid)
+            completed_calls.add(cid)
+
+    # Highlight the very last event processed (focus)
+    focus = events[step - 1]["call_id"] if step > 0 else None
+    return active_calls, completed_calls, visible_calls, focus
+
+
+def node_label(call, completed):
+    """Builds the `func(args)` label, plus any hidden-call summary and the return value once the call has ended."""
+    args_str = ", ".join([str(a) for a in call["args"]])
+    # Handle kwargs if any (though our algos mostly don't use them)
+    if call["kwargs"]:
+        kwargs_str = ", ".join([f"{k}={v}" for k, v in call["kwargs"].items()])
+        if args_str:
+            args_str += ", " + kwargs_str
+        else:
+            args_str = kwargs_str
+
+    label = f"{call['func_name']}({args_str})"
+
+    # Calls a sampling/depth-capped trace skipped below this one
+    if call.get("hidden_calls"):
+        label += f"\n+{call['hidden_calls']} hidden calls ({call['hidden_time'] * 1000:.2f} ms)"
+
+    # Add return value if completed AND processed as an end event
+    # Note: A call is in completed_calls only if we processed its 'end' event.
+    if completed:
+        ret_str = str(call["return_value"])
+        if len(ret_str) > 20:
+            ret_str = ret_str[:17] + "..."
+        label += f"\nReturn: {ret_str}"
+    return label
+
+
+def node_state(cid, active_calls, completed_calls):
+    if cid in completed_calls:
+        return "completed"
+    if cid in active_calls:
+        return "active"
+    return "pending"